@@ -1,55 +1,200 @@
 import sqlite3
-import pandas as pd
-import numpy as np
-import datetime
-import re
+from functools import lru_cache
+
+# ================= SQL STATEMENTS =================
+# Kept as module-level constants so every call sends identical SQL text
+# and hits the shared connection's prepared-statement cache.
+
+# Per-connection settings, so they are applied in get_conn() rather than with the schema.
+SQL_CONNECTION_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+PRAGMA foreign_keys=ON;
+"""
+
+SQL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    meter_no TEXT UNIQUE,
+    address TEXT,
+    phone TEXT
+);
+
+CREATE TABLE IF NOT EXISTS readings(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id INTEGER,
+    date TEXT,
+    reading REAL,
+    FOREIGN KEY(client_id) REFERENCES clients(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS bills(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id INTEGER,
+    start_date TEXT,
+    end_date TEXT,
+    units REAL,
+    amount REAL,
+    status TEXT,
+    FOREIGN KEY(client_id) REFERENCES clients(id) ON DELETE CASCADE
+);
+
+-- meter_no is already indexed through its UNIQUE constraint
+CREATE INDEX IF NOT EXISTS idx_readings_client_date ON readings(client_id, date);
+CREATE INDEX IF NOT EXISTS idx_bills_client ON bills(client_id);
+"""
+
+SQL_INSERT_CLIENT = "INSERT INTO clients(name, meter_no, address, phone) VALUES (?, ?, ?, ?)"
+SQL_VIEW_CLIENTS = "SELECT * FROM clients"
+SQL_SELECT_CLIENT_NAME = "SELECT name FROM clients WHERE id=?"
+SQL_DELETE_CLIENT = "DELETE FROM clients WHERE id=?"
+
+SQL_INSERT_READING = "INSERT INTO readings(client_id, date, reading) VALUES (?, ?, ?)"
+SQL_VIEW_READINGS_JOIN = """SELECT r.id, c.name, r.date, r.reading
+                            FROM readings r JOIN clients c ON r.client_id=c.id
+                            ORDER BY r.date"""
+
+# Bills each selected client on the first and last readings in the range,
+# skipping clients with fewer than two readings there.
+_SQL_INSERT_BILLS_TEMPLATE = """INSERT INTO bills(client_id, start_date, end_date, units, amount, status)
+                                SELECT client_id, :start, :end,
+                                       ROUND(last_r - first_r, 2),
+                                       ROUND(ROUND(last_r - first_r, 2) * :rate, 2),
+                                       'Unpaid'
+                                FROM (SELECT c.id AS client_id,
+                                    (SELECT reading FROM readings
+                                     WHERE client_id=c.id AND date BETWEEN :start AND :end
+                                     ORDER BY date ASC LIMIT 1) AS first_r,
+                                    (SELECT reading FROM readings
+                                     WHERE client_id=c.id AND date BETWEEN :start AND :end
+                                     ORDER BY date DESC LIMIT 1) AS last_r,
+                                    (SELECT COUNT(*) FROM (SELECT 1 FROM readings
+                                     WHERE client_id=c.id AND date BETWEEN :start AND :end
+                                     LIMIT 2)) AS n
+                                    FROM clients c {client_filter})
+                                WHERE n >= 2"""
+SQL_INSERT_BILL_FROM_RANGE = _SQL_INSERT_BILLS_TEMPLATE.format(client_filter="WHERE c.id=:client_id")
+SQL_INSERT_BILLS_ALL_CLIENTS = _SQL_INSERT_BILLS_TEMPLATE.format(client_filter="")
+SQL_SELECT_BILL_TOTALS = "SELECT units, amount FROM bills WHERE id=?"
+SQL_VIEW_BILLS_JOIN = """SELECT b.id, c.name, b.start_date, b.end_date, b.units, b.amount, b.status
+                         FROM bills b JOIN clients c ON b.client_id=c.id"""
+
+SQL_DROP_ANALYSIS_CACHE = "DROP TABLE IF EXISTS temp.analysis_cache"
+SQL_CREATE_ANALYSIS_CACHE = """CREATE TEMP TABLE analysis_cache AS
+                               SELECT c.name, b.units, b.amount
+                               FROM bills b JOIN clients c ON b.client_id=c.id"""
+SQL_ANALYSIS_TOTALS = """SELECT COUNT(*), SUM(units), SUM(amount), AVG(units), MAX(units)
+                         FROM analysis_cache"""
+# With ORDER BY ... LIMIT, SQLite keeps only the top rows in its sorter instead of sorting every group.
+SQL_ANALYSIS_TOP_CONSUMERS = """SELECT name, SUM(units) AS total_units
+                                FROM analysis_cache
+                                GROUP BY name
+                                ORDER BY total_units DESC
+                                LIMIT 5"""
+
 
 # ================= DATABASE SETUP =================
+DB_PATH = "eb_system.db"
+_CONN = None
+# Set whenever bills or clients change so show_analysis rebuilds its temp table.
+_analysis_dirty = True
+
+
+def get_conn():
+    """Returns the shared connection, opening it on first use."""
+    global _CONN, _analysis_dirty
+    if _CONN is None:
+        _CONN = sqlite3.connect(DB_PATH)
+        _analysis_dirty = True
+        _CONN.executescript(SQL_CONNECTION_PRAGMAS)
+    return _CONN
+
+
+def close_conn():
+    """Closes the shared connection if it is open."""
+    global _CONN
+    if _CONN is not None:
+        _CONN.execute("PRAGMA optimize")
+        _CONN.close()
+        _CONN = None
+
+
+def _tables_without_cascade(conn):
+    """Lists child tables whose client_id foreign key predates ON DELETE CASCADE."""
+    return [table for table in ("readings", "bills")
+            if any(fk[6] != "CASCADE" for fk in conn.execute(f"PRAGMA foreign_key_list({table})"))]
+
+
+def _rebuild_with_cascade(conn, stale):
+    """Rebuilds child tables from SQL_SCHEMA, since SQLite cannot alter a constraint in place."""
+    move_aside = ""
+    copy_back = ""
+    for table in stale:
+        for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+            if index[3] == "c":
+                move_aside += f"DROP INDEX {index[1]};\n"
+        move_aside += f"ALTER TABLE {table} RENAME TO {table}_old;\n"
+        # The rename moved the AUTOINCREMENT counter to {table}_old; hand it back so ids are never reused.
+        copy_back += (f"INSERT INTO {table} SELECT * FROM {table}_old;\n"
+                      f"DELETE FROM sqlite_sequence WHERE name='{table}';\n"
+                      f"UPDATE sqlite_sequence SET name='{table}' WHERE name='{table}_old';\n"
+                      f"DROP TABLE {table}_old;\n")
+
+    # Foreign keys stay off for the copy: rows left behind by earlier client
+    # removals would otherwise fail the constraint check.
+    conn.execute("PRAGMA foreign_keys=OFF")
+    try:
+        conn.executescript("BEGIN;\n" + move_aside + SQL_SCHEMA + copy_back + "COMMIT;")
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys=ON")
+
+
 def create_tables():
-    conn = sqlite3.connect("eb_system.db")
-    cur = conn.cursor()
+    conn = get_conn()
+    stale = _tables_without_cascade(conn)
+    if stale:
+        _rebuild_with_cascade(conn, stale)
+    else:
+        conn.executescript(SQL_SCHEMA)
+    conn.execute("ANALYZE")
 
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS clients(
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT,
-        meter_no TEXT UNIQUE,
-        address TEXT,
-        phone TEXT
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS readings(
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        client_id INTEGER,
-        date TEXT,
-        reading REAL,
-        FOREIGN KEY(client_id) REFERENCES clients(id)
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS bills(
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        client_id INTEGER,
-        start_date TEXT,
-        end_date TEXT,
-        units REAL,
-        amount REAL,
-        status TEXT,
-        FOREIGN KEY(client_id) REFERENCES clients(id)
-    )
-    """)
-
-    conn.commit()
-    conn.close()
+
+# ================= OUTPUT HELPERS =================
+def _print_rows(cur, title, empty_message):
+    """Prints a cursor's rows as tab-separated lines, streaming them as they arrive."""
+    first = cur.fetchone()
+    if first is None:
+        print(empty_message)
+        return
+    print(title)
+    print("\t".join(d[0] for d in cur.description))
+    print("\t".join(map(str, first)))
+    for row in cur:
+        print("\t".join(map(str, row)))
+
+
+@lru_cache(maxsize=None)
+def _get_pd():
+    """Imports pandas on first use so menu startup does not pay for it."""
+    import pandas as pd
+    return pd
+
+
+def _read_dataframe(sql):
+    """Loads a query into a pandas DataFrame for callers that opt in."""
+    return _get_pd().read_sql_query(sql, get_conn())
 
 
 # ================= VALIDATION FUNCTION =================
 def validate_phone(phone):
     """Checks if a phone number has exactly 10 digits."""
-    return re.fullmatch(r"\d{10}", phone) is not None
+    return len(phone) == 10 and phone.isascii() and phone.isdigit()
 
 
 # ================= CLIENT FUNCTIONS =================
@@ -69,29 +214,23 @@ def add_client():
     
     client_data = (name, meter, address, phone)
 
-    conn = sqlite3.connect("eb_system.db")
-    cur = conn.cursor()
+    conn = get_conn()
     try:
-        cur.execute("INSERT INTO clients(name, meter_no, address, phone) VALUES (?, ?, ?, ?)", client_data)
-        conn.commit()
+        with conn:
+            conn.execute(SQL_INSERT_CLIENT, client_data)
         print(" Client added successfully!\n")
     except sqlite3.IntegrityError:
         print(" Meter number already exists! Try a different one.\n")
-    conn.close()
 
 
-def view_clients():
-    conn = sqlite3.connect("eb_system.db")
-    df = pd.read_sql_query("SELECT * FROM clients", conn)
-    if df.empty:
-        print("No clients found.\n")
-    else:
-        print("\n--- CLIENT LIST ---")
-        print(df)
-    conn.close()
+def view_clients(as_dataframe=False):
+    if as_dataframe:
+        return _read_dataframe(SQL_VIEW_CLIENTS)
+    _print_rows(get_conn().execute(SQL_VIEW_CLIENTS), "\n--- CLIENT LIST ---", "No clients found.\n")
 
 
 def remove_client():
+    global _analysis_dirty
     view_clients()
     try:
         client_id = int(input("Enter Client ID to remove: "))
@@ -99,85 +238,84 @@ def remove_client():
         print("Invalid input. Please enter a valid numeric ID.")
         return
 
-    conn = sqlite3.connect("eb_system.db")
+    conn = get_conn()
     cur = conn.cursor()
-    cur.execute("SELECT * FROM clients WHERE id=?", (client_id,))
+    cur.execute(SQL_SELECT_CLIENT_NAME, (client_id,))
     row = cur.fetchone()
 
     if not row:
         print(" No client found with that ID.")
     else:
-        confirm = input(f"Are you sure you want to delete client '{row[1]}'? (y/n): ").lower()
+        confirm = input(f"Are you sure you want to delete client '{row[0]}'? (y/n): ").lower()
         if confirm == 'y':
-            cur.execute("DELETE FROM clients WHERE id=?", (client_id,))
-            conn.commit()
+            with conn:
+                conn.execute(SQL_DELETE_CLIENT, (client_id,))
+            _analysis_dirty = True
             print(" Client removed successfully!")
         else:
             print(" Deletion cancelled.")
-    conn.close()
 
 
 # ================= READING FUNCTIONS =================
 def add_reading():
     view_clients()
-    client_id = input("Enter Client ID: ")
+    try:
+        client_id = int(input("Enter Client ID: "))
+    except ValueError:
+        print("Invalid input. Please enter a valid numeric ID.")
+        return
     date = input("Enter reading date (YYYY-MM-DD): ")
     reading = float(input("Enter reading in kWh: "))
 
-    conn = sqlite3.connect("eb_system.db")
-    cur = conn.cursor()
-    cur.execute("INSERT INTO readings(client_id, date, reading) VALUES (?, ?, ?)",
-                (client_id, date, reading))
-    conn.commit()
-    conn.close()
+    try:
+        bulk_add_readings([(client_id, date, reading)])
+    except sqlite3.IntegrityError:
+        print(" No client found with that ID.\n")
+        return
     print(" Reading added successfully!\n")
 
 
-def view_readings():
-    conn = sqlite3.connect("eb_system.db")
-    df = pd.read_sql_query("""SELECT r.id, c.name, r.date, r.reading
-                              FROM readings r JOIN clients c ON r.client_id=c.id
-                              ORDER BY r.date""", conn)
-    if df.empty:
-        print("No readings found.\n")
-    else:
-        print("\n--- METER READINGS ---")
-        print(df)
-    conn.close()
+def bulk_add_readings(rows):
+    """Inserts (client_id, date, reading) rows in a single transaction."""
+    with get_conn() as conn:
+        conn.executemany(SQL_INSERT_READING, rows)
+
+
+def view_readings(as_dataframe=False):
+    if as_dataframe:
+        return _read_dataframe(SQL_VIEW_READINGS_JOIN)
+    _print_rows(get_conn().execute(SQL_VIEW_READINGS_JOIN), "\n--- METER READINGS ---", "No readings found.\n")
 
 
 # ================= BILLING FUNCTIONS =================
 def generate_bill():
+    global _analysis_dirty
     view_clients()
-    client_id = input("Enter Client ID: ")
+    try:
+        client_id = int(input("Enter Client ID: "))
+    except ValueError:
+        print("Invalid input. Please enter a valid numeric ID.")
+        return
     start = input("Enter start date (YYYY-MM-DD): ")
     end = input("Enter end date (YYYY-MM-DD): ")
 
-    conn = sqlite3.connect("eb_system.db")
-    cur = conn.cursor()
-    cur.execute("""SELECT reading FROM readings 
-                   WHERE client_id=? AND date BETWEEN ? AND ?
-                   ORDER BY date ASC""", (client_id, start, end))
-    readings = [r[0] for r in cur.fetchall()]
-    conn.close()
-
-    if len(readings) < 2:
-        print("⚠️ Not enough readings to generate bill.\n")
-        return
-
-    
-    units = np.round(readings[-1] - readings[0], 2)
     rate = 5.0
-    amount = np.round(units * rate, 2)
+    params = {"client_id": client_id, "start": start, "end": end, "rate": rate}
 
-    conn = sqlite3.connect("eb_system.db")
-    cur = conn.cursor()
-    cur.execute("INSERT INTO bills(client_id, start_date, end_date, units, amount, status) VALUES (?, ?, ?, ?, ?, ?)",
-                (client_id, start, end, units, amount, "Unpaid"))
-    conn.commit()
-    conn.close()
+    conn = get_conn()
+    with conn:
+        cur = conn.execute(SQL_INSERT_BILL_FROM_RANGE, params)
+
+    if cur.rowcount == 0:
+        if conn.execute(SQL_SELECT_CLIENT_NAME, (client_id,)).fetchone() is None:
+            print(" No client found with that ID.\n")
+        else:
+            print("⚠️ Not enough readings to generate bill.\n")
+        return
+    _analysis_dirty = True
+
+    units, amount = conn.execute(SQL_SELECT_BILL_TOTALS, (cur.lastrowid,)).fetchone()
 
-    
     bill_summary = {
         "Client ID": client_id,
         "Units": units,
@@ -192,44 +330,56 @@ def generate_bill():
     print()
 
 
-def view_bills():
-    conn = sqlite3.connect("eb_system.db")
-    df = pd.read_sql_query("""SELECT b.id, c.name, b.start_date, b.end_date, b.units, b.amount, b.status
-                              FROM bills b JOIN clients c ON b.client_id=c.id""", conn)
-    if df.empty:
-        print("No bills found.\n")
-    else:
-        print("\n--- BILL DETAILS ---")
-        print(df)
-    conn.close()
+def generate_all_bills():
+    global _analysis_dirty
+    start = input("Enter start date (YYYY-MM-DD): ")
+    end = input("Enter end date (YYYY-MM-DD): ")
+
+    rate = 5.0
+    conn = get_conn()
+    with conn:
+        cur = conn.execute(SQL_INSERT_BILLS_ALL_CLIENTS, {"start": start, "end": end, "rate": rate})
+
+    if cur.rowcount == 0:
+        print("⚠️ No client has enough readings to generate a bill.\n")
+        return
+    _analysis_dirty = True
+    print(f"\n {cur.rowcount} bill(s) generated successfully!\n")
 
 
-# ================= ANALYSIS USING PANDAS, NUMPY, LIST =================
+def view_bills(as_dataframe=False):
+    if as_dataframe:
+        return _read_dataframe(SQL_VIEW_BILLS_JOIN)
+    _print_rows(get_conn().execute(SQL_VIEW_BILLS_JOIN), "\n--- BILL DETAILS ---", "No bills found.\n")
+
+
+# ================= ANALYSIS USING SQL AGGREGATES, LIST =================
 def show_analysis():
-    conn = sqlite3.connect("eb_system.db")
-    df_bills = pd.read_sql_query("""SELECT c.name, b.units, b.amount
-                                    FROM bills b JOIN clients c ON b.client_id=c.id""", conn)
-    conn.close()
+    global _analysis_dirty
+    conn = get_conn()
+    if _analysis_dirty:
+        with conn:
+            conn.execute(SQL_DROP_ANALYSIS_CACHE)
+            conn.execute(SQL_CREATE_ANALYSIS_CACHE)
+        _analysis_dirty = False
+
+    cur = conn.cursor()
+    cur.execute(SQL_ANALYSIS_TOTALS)
+    bill_count, total_units, total_amount, avg_units, max_units = cur.fetchone()
 
-    if df_bills.empty:
+    if bill_count == 0:
         print("No billing data to analyze.\n")
         return
 
     print("\n--- ELECTRICITY CONSUMPTION ANALYSIS ---")
 
-    total_units = np.sum(df_bills['units'])
-    total_amount = np.sum(df_bills['amount'])
-    avg_units = np.mean(df_bills['units'])
-    max_units = np.max(df_bills['units'])
-
     print(f"🔹 Total Units Consumed: {total_units} kWh")
     print(f"🔹 Total Revenue Collected: ₹{total_amount}")
     print(f"🔹 Average Units per Bill: {avg_units:.2f}")
     print(f"🔹 Highest Consumption in a Bill: {max_units} kWh\n")
 
-    
-    top_consumers = df_bills.groupby("name")["units"].sum().sort_values(ascending=False).head(5)
-    top_list = list(zip(top_consumers.index, top_consumers.values))
+    cur.execute(SQL_ANALYSIS_TOP_CONSUMERS)
+    top_list = cur.fetchall()
 
     print("--- Top 5 Consumers (Name, Units) ---")
     for name, units in top_list:
@@ -249,7 +399,8 @@ def main_menu():
         print("5. View Readings")
         print("6. Generate Bill")
         print("7. View Bills")
-        print("8. Show Analysis (Pandas + NumPy + Lists)")
+        print("8. Show Analysis")
+        print("9. Generate Bills for All Clients")
         print("0. Exit")
 
         choice = input("Enter choice: ")
@@ -270,8 +421,11 @@ def main_menu():
             view_bills()
         elif choice == '8':
             show_analysis()
+        elif choice == '9':
+            generate_all_bills()
         elif choice == '0':
             print("Thank you for using the system! 👋")
+            close_conn()
             break
         else:
             print("Invalid choice. Try again!")